@@ -3,6 +3,11 @@ Hair Removal Salon - Customer Flow Simulation
 Calculates optimal MaxCustomers and chair counts per grade
 """
 
+import bisect
+import collections
+import functools
+import heapq
+import multiprocessing
 import random
 
 # Configuration
@@ -29,126 +34,188 @@ CASHIER_TIME_MAX = 10
 MOVE_TIME = 3  # Time to move between areas
 WAIT_TIMEOUT = 75  # Average of 60-90 seconds
 
-def simulate_grade(grade, total_customers, beds, num_runs=10):
-    """Simulate customer flow for a grade and return statistics"""
+# Average times
+AVG_TREATMENT = (TREATMENT_TIME_MIN + TREATMENT_TIME_MAX) / 2  # 20s
+AVG_RECEPTION = (RECEPTION_TIME_MIN + RECEPTION_TIME_MAX) / 2  # 7.5s
+AVG_CASHIER = (CASHIER_TIME_MIN + CASHIER_TIME_MAX) / 2  # 7.5s
+AVG_MOVE = MOVE_TIME  # 3s
+
+# Total stay time per customer
+TOTAL_STAY = AVG_MOVE * 4 + AVG_RECEPTION + AVG_TREATMENT + AVG_CASHIER
+
+# Treatments one bed can finish per day (including moving in and out)
+BED_TURNS_PER_DAY = int(BUSINESS_TIME / (AVG_TREATMENT + AVG_MOVE * 2))
+
+def sample_uniform(rng, low, high, n):
+    """Draw n samples from uniform(low, high) in one batch"""
+    span = high - low
+    rand = rng.random
+    return [low + span * rand() for _ in range(n)]
+
+def estimate_max_simultaneous(total_customers, spawn_interval):
+    """Peak occupancy of the nominal arrival schedule"""
+    stay_time = TOTAL_STAY
+    
+    # Sweep line: arrivals and exits are both already sorted, so merge them
+    # instead of sampling the day. Occupancy only peaks right after an arrival.
+    first = 0  # First customer still inside (arrival + stay_time > t)
+    max_simultaneous = 0
+    for i in range(total_customers):
+        t = i * spawn_interval
+        while t >= first * spawn_interval + stay_time:
+            first += 1
+        max_simultaneous = max(max_simultaneous, i + 1 - first)
+    return max_simultaneous
+
+def serve_customers(beds, spawn_interval, arrival_jitter, reception_times, treatment_times, cashier_times):
+    """Push one day of pre-sampled customers through the salon
+    
+    Pure number crunching over plain lists and floats (no randomness, no
+    dicts), so it can be handed to a JIT compiler as-is.
+    Returns (max_reception, max_waiting, max_cashier, max_simultaneous, served, left).
+    """
+    total_customers = len(arrival_jitter)
+    
+    # When each bed becomes free (min-heap). heapq needs a list; it already
+    # holds only floats and beds stay small, so an array buys nothing here.
+    bed_free_at = [0.0] * beds
+    heapreplace = heapq.heapreplace
+    insort = bisect.insort
+    bisect_right = bisect.bisect_right
+    reception_free_at = 0
+    cashier_free_at = 0
     
-    results = []
+    # Stats
+    max_reception = 0
+    max_waiting = 0
+    max_cashier = 0
+    max_simultaneous = 0
+    customers_served = 0
+    customers_left = 0
     
-    for run in range(num_runs):
-        spawn_interval = BUSINESS_TIME / total_customers
+    # Active customers in the shop
+    active_exits = []  # Sorted exit times of served customers (ids are never read)
+    
+    # Loop invariants as locals (LOAD_FAST instead of LOAD_GLOBAL), and
+    # multiply by the reciprocal instead of dividing in every queue stat
+    inv_spawn = 1.0 / spawn_interval
+    move_time = MOVE_TIME
+    wait_timeout = WAIT_TIMEOUT
+    
+    # Simulate each customer arrival
+    for i in range(total_customers):
+        arrival_time = i * spawn_interval + arrival_jitter[i]
+        arrival_time = max(0, arrival_time)
+        
+        # Customer flow times
+        reception_wait_start = arrival_time + move_time
+        reception_start = max(reception_wait_start, reception_free_at)
+        reception_time = reception_times[i]
+        reception_end = reception_start + reception_time
+        reception_free_at = reception_end
+        
+        # Check if customer waited too long at reception
+        if reception_start - reception_wait_start > wait_timeout:
+            customers_left += 1
+            continue
+        
+        # Track reception queue size
+        max_reception = max(max_reception, int((reception_start - reception_wait_start) * inv_spawn) + 1)
+        
+        # Waiting for bed
+        waiting_start = reception_end + move_time
+        bed_available = bed_free_at[0]
+        treatment_start = max(waiting_start, bed_available)
+        
+        # Check if customer waited too long for bed
+        if treatment_start - waiting_start > wait_timeout:
+            customers_left += 1
+            continue
         
-        # Track queues and states
-        reception_queue = []  # List of (arrival_time, customer_id)
-        waiting_queue = []    # Waiting for treatment
-        cashier_queue = []    # Waiting for payment
+        # Track waiting queue size
+        waiting_time = treatment_start - waiting_start
+        max_waiting = max(max_waiting, int(waiting_time * inv_spawn) + 1)
         
-        bed_free_at = [0] * beds  # When each bed becomes free
-        reception_free_at = 0
-        cashier_free_at = 0
+        # Treatment
+        treatment_time = treatment_times[i]
+        treatment_end = treatment_start + treatment_time
+        heapreplace(bed_free_at, treatment_end)
         
-        # Stats
-        max_reception = 0
-        max_waiting = 0
-        max_cashier = 0
-        max_simultaneous = 0
-        customers_served = 0
-        customers_left = 0
+        # Cashier
+        cashier_wait_start = treatment_end + move_time
+        cashier_start = max(cashier_wait_start, cashier_free_at)
         
-        # Active customers in the shop
-        active_customers = []  # (customer_id, exit_time)
+        # Check if customer waited too long at cashier
+        if cashier_start - cashier_wait_start > wait_timeout:
+            customers_left += 1
+            continue
         
-        # Simulate each customer arrival
-        for i in range(total_customers):
-            arrival_time = i * spawn_interval + random.uniform(-spawn_interval*0.3, spawn_interval*0.3)
-            arrival_time = max(0, arrival_time)
-            
-            # Customer flow times
-            reception_wait_start = arrival_time + MOVE_TIME
-            reception_start = max(reception_wait_start, reception_free_at)
-            reception_time = random.uniform(RECEPTION_TIME_MIN, RECEPTION_TIME_MAX)
-            reception_end = reception_start + reception_time
-            reception_free_at = reception_end
-            
-            # Check if customer waited too long at reception
-            if reception_start - reception_wait_start > WAIT_TIMEOUT:
-                customers_left += 1
-                continue
-            
-            # Track reception queue size
-            reception_queue_size = sum(1 for t in active_customers if t[1] > reception_wait_start)
-            max_reception = max(max_reception, int((reception_start - reception_wait_start) / spawn_interval) + 1)
-            
-            # Waiting for bed
-            waiting_start = reception_end + MOVE_TIME
-            earliest_bed = min(range(beds), key=lambda b: bed_free_at[b])
-            bed_available = bed_free_at[earliest_bed]
-            treatment_start = max(waiting_start, bed_available)
-            
-            # Check if customer waited too long for bed
-            if treatment_start - waiting_start > WAIT_TIMEOUT:
-                customers_left += 1
-                continue
-            
-            # Track waiting queue size
-            waiting_time = treatment_start - waiting_start
-            max_waiting = max(max_waiting, int(waiting_time / spawn_interval) + 1)
-            
-            # Treatment
-            treatment_time = random.uniform(TREATMENT_TIME_MIN, TREATMENT_TIME_MAX)
-            treatment_end = treatment_start + treatment_time
-            bed_free_at[earliest_bed] = treatment_end
-            
-            # Cashier
-            cashier_wait_start = treatment_end + MOVE_TIME
-            cashier_start = max(cashier_wait_start, cashier_free_at)
-            
-            # Check if customer waited too long at cashier
-            if cashier_start - cashier_wait_start > WAIT_TIMEOUT:
-                customers_left += 1
-                continue
-            
-            # Track cashier queue size
-            cashier_wait_time = cashier_start - cashier_wait_start
-            max_cashier = max(max_cashier, int(cashier_wait_time / spawn_interval) + 1)
-            
-            cashier_time = random.uniform(CASHIER_TIME_MIN, CASHIER_TIME_MAX)
-            cashier_end = cashier_start + cashier_time
-            cashier_free_at = cashier_end
-            
-            # Customer exits
-            exit_time = cashier_end + MOVE_TIME
-            active_customers.append((i, exit_time))
-            customers_served += 1
-            
-            # Calculate simultaneous customers at this point
-            current_time = arrival_time
-            simultaneous = sum(1 for c in active_customers if c[1] > current_time)
-            max_simultaneous = max(max_simultaneous, simultaneous)
+        # Track cashier queue size
+        cashier_wait_time = cashier_start - cashier_wait_start
+        max_cashier = max(max_cashier, int(cashier_wait_time * inv_spawn) + 1)
         
-        # Clean up - calculate final max simultaneous
-        for t in range(0, int(BUSINESS_TIME), 5):
-            simultaneous = 0
-            for i in range(total_customers):
-                arrival = i * spawn_interval
-                # Estimate stay time
-                stay_time = MOVE_TIME * 4 + (RECEPTION_TIME_MIN + RECEPTION_TIME_MAX) / 2 + \
-                           (TREATMENT_TIME_MIN + TREATMENT_TIME_MAX) / 2 + \
-                           (CASHIER_TIME_MIN + CASHIER_TIME_MAX) / 2
-                if arrival <= t < arrival + stay_time:
-                    simultaneous += 1
-            max_simultaneous = max(max_simultaneous, simultaneous)
+        cashier_time = cashier_times[i]
+        cashier_end = cashier_start + cashier_time
+        cashier_free_at = cashier_end
         
-        results.append({
-            'max_reception': max_reception,
-            'max_waiting': max_waiting,
-            'max_cashier': max_cashier,
-            'max_simultaneous': max_simultaneous,
-            'served': customers_served,
-            'left': customers_left,
-        })
-    
-    # Average results
-    avg = {
+        # Customer exits
+        exit_time = cashier_end + move_time
+        insort(active_exits, exit_time)
+        customers_served += 1
+        
+        # Calculate simultaneous customers at this point
+        current_time = arrival_time
+        simultaneous = len(active_exits) - bisect_right(active_exits, current_time)
+        max_simultaneous = max(max_simultaneous, simultaneous)
+    
+    return max_reception, max_waiting, max_cashier, max_simultaneous, customers_served, customers_left
+
+def simulate_run(total_customers, beds, spawn_interval, estimated_simultaneous, seed):
+    """Simulate one day of customer flow and return its statistics"""
+    rng = random.Random(seed)
+    
+    # Draw this run's random samples up front
+    arrival_jitter = sample_uniform(rng, -spawn_interval*0.3, spawn_interval*0.3, total_customers)
+    reception_times = sample_uniform(rng, RECEPTION_TIME_MIN, RECEPTION_TIME_MAX, total_customers)
+    treatment_times = sample_uniform(rng, TREATMENT_TIME_MIN, TREATMENT_TIME_MAX, total_customers)
+    cashier_times = sample_uniform(rng, CASHIER_TIME_MIN, CASHIER_TIME_MAX, total_customers)
+    
+    max_reception, max_waiting, max_cashier, max_simultaneous, served, left = serve_customers(
+        beds, spawn_interval, arrival_jitter, reception_times, treatment_times, cashier_times)
+    
+    # Clean up - calculate final max simultaneous
+    max_simultaneous = max(max_simultaneous, estimated_simultaneous)
+    
+    return {
+        'max_reception': max_reception,
+        'max_waiting': max_waiting,
+        'max_cashier': max_cashier,
+        'max_simultaneous': max_simultaneous,
+        'served': served,
+        'left': left,
+    }
+
+def run_tasks(grade, total_customers, beds, num_runs, seeder):
+    """Build the simulate_run argument tuples for one grade
+    
+    seeder is a random.Random that hands out one child seed per run.
+    """
+    spawn_interval = BUSINESS_TIME / total_customers
+    
+    # The nominal schedule does not depend on the random draws,
+    # so its peak occupancy is shared by every run
+    estimated_simultaneous = estimate_max_simultaneous(total_customers, spawn_interval)
+    
+    # Give every run its own seed so workers never share a random stream
+    return [
+        (total_customers, beds, spawn_interval, estimated_simultaneous, seeder.getrandbits(64))
+        for _ in range(num_runs)
+    ]
+
+def summarize_runs(results):
+    """Reduce per-run statistics to the worst-case / average summary"""
+    num_runs = len(results)
+    return {
         'max_reception': max(r['max_reception'] for r in results),
         'max_waiting': max(r['max_waiting'] for r in results),
         'max_cashier': max(r['max_cashier'] for r in results),
@@ -156,8 +223,98 @@ def simulate_grade(grade, total_customers, beds, num_runs=10):
         'avg_served': sum(r['served'] for r in results) / num_runs,
         'avg_left': sum(r['left'] for r in results) / num_runs,
     }
+
+def simulate_grade(grade, total_customers, beds, num_runs=10, processes=None, seed=None):
+    """Simulate customer flow for a grade and return statistics
+    
+    Runs are independent, so they are spread over a process pool.
+    processes=None uses every CPU core, processes=1 runs in-process.
+    The same seed reproduces the same statistics regardless of processes.
+    """
+    tasks = run_tasks(grade, total_customers, beds, num_runs, random.Random(seed))
+    if processes == 1:
+        results = [simulate_run(*task) for task in tasks]
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.starmap(simulate_run, tasks)
     
-    return avg
+    return summarize_runs(results)
+
+def simulate_all_grades(num_runs=10, processes=None, seed=None):
+    """Simulate every grade in GRADES and return {grade: statistics}
+    
+    All runs of all grades go through one process pool as a flat task list,
+    so short low-grade runs do not leave cores idle.
+    """
+    seeder = random.Random(seed)
+    grades = []
+    tasks = []
+    for grade, (customers, beds) in GRADES.items():
+        grades.extend([grade] * num_runs)
+        tasks.extend(run_tasks(grade, customers, beds, num_runs, seeder))
+    
+    if processes == 1:
+        results = [simulate_run(*task) for task in tasks]
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.starmap(simulate_run, tasks, chunksize=4)
+    
+    by_grade = collections.defaultdict(list)
+    for grade, result in zip(grades, results):
+        by_grade[grade].append(result)
+    return {grade: summarize_runs(runs) for grade, runs in by_grade.items()}
+
+def theoretical_row(grade, customers, beds):
+    """Queuing-theory recommendation for one grade configuration"""
+    spawn_interval = BUSINESS_TIME / customers
+    
+    # Simultaneous customers = stay_time / spawn_interval
+    max_simultaneous = int(TOTAL_STAY / spawn_interval) + 2  # +2 for buffer
+    
+    # Bed capacity per day
+    bed_capacity = BED_TURNS_PER_DAY * beds
+    
+    # Reception chairs: 1 receptionist, queue builds when faster than processing
+    # If spawn_interval < AVG_RECEPTION, queue builds
+    if spawn_interval < AVG_RECEPTION:
+        reception_queue = int((AVG_RECEPTION - spawn_interval) * customers / AVG_RECEPTION) + 1
+    else:
+        reception_queue = 1
+    reception_chairs = min(reception_queue, max_simultaneous // 2)
+    
+    # Waiting chairs: depends on bed availability
+    # If customers arrive faster than beds can process
+    arrivals_per_treatment = AVG_TREATMENT / spawn_interval
+    waiting_chairs = max(2, int(arrivals_per_treatment * 1.5))
+    waiting_chairs = min(waiting_chairs, beds * 2)  # Cap at 2x beds
+    
+    # Cashier chairs: similar to reception
+    if spawn_interval < AVG_CASHIER:
+        cashier_queue = int((AVG_CASHIER - spawn_interval) * customers / AVG_CASHIER) + 1
+    else:
+        cashier_queue = 1
+    cashier_chairs = min(cashier_queue, max_simultaneous // 3)
+    
+    return {
+        'grade': grade,
+        'customers': customers,
+        'beds': beds,
+        'spawn_interval': spawn_interval,
+        'max_simultaneous': max_simultaneous,
+        'reception_chairs': reception_chairs,
+        'waiting_chairs': waiting_chairs,
+        'cashier_chairs': cashier_chairs,
+        'bed_capacity': bed_capacity,
+    }
+
+@functools.lru_cache(maxsize=1)
+def theoretical_recommendations():
+    """Per-grade recommendations based on queuing theory
+    
+    Depends only on module constants, so it is computed once and cached.
+    Returns a tuple of dicts; treat them as read-only.
+    """
+    return tuple(theoretical_row(grade, customers, beds) for grade, (customers, beds) in GRADES.items())
 
 def calculate_theoretical():
     """Calculate theoretical values based on queuing theory"""
@@ -165,68 +322,21 @@ def calculate_theoretical():
     print("THEORETICAL CALCULATION (Queue Theory)")
     print("=" * 80)
     
-    # Average times
-    avg_treatment = (TREATMENT_TIME_MIN + TREATMENT_TIME_MAX) / 2  # 20s
-    avg_reception = (RECEPTION_TIME_MIN + RECEPTION_TIME_MAX) / 2  # 7.5s
-    avg_cashier = (CASHIER_TIME_MIN + CASHIER_TIME_MAX) / 2  # 7.5s
-    avg_move = MOVE_TIME  # 3s
-    
-    # Total stay time per customer
-    total_stay = avg_move * 4 + avg_reception + avg_treatment + avg_cashier
-    print(f"\nAverage customer stay time: {total_stay:.1f}s")
-    print(f"  - Movement: {avg_move * 4}s")
-    print(f"  - Reception: {avg_reception}s")
-    print(f"  - Treatment: {avg_treatment}s")
-    print(f"  - Cashier: {avg_cashier}s")
+    print(f"\nAverage customer stay time: {TOTAL_STAY:.1f}s")
+    print(f"  - Movement: {AVG_MOVE * 4}s")
+    print(f"  - Reception: {AVG_RECEPTION}s")
+    print(f"  - Treatment: {AVG_TREATMENT}s")
+    print(f"  - Cashier: {AVG_CASHIER}s")
     
     print("\n" + "-" * 80)
     print(f"{'Grade':>5} | {'Customers':>9} | {'Beds':>4} | {'Interval':>8} | {'MaxCust':>7} | {'Reception':>9} | {'Waiting':>7} | {'Cashier':>7} | {'Bed Cap':>7}")
     print("-" * 80)
     
-    recommendations = []
-    
-    for grade, (customers, beds) in GRADES.items():
-        spawn_interval = BUSINESS_TIME / customers
-        
-        # Simultaneous customers = stay_time / spawn_interval
-        max_simultaneous = int(total_stay / spawn_interval) + 2  # +2 for buffer
-        
-        # Bed capacity per day
-        bed_capacity = int(BUSINESS_TIME / (avg_treatment + avg_move * 2)) * beds
-        
-        # Reception chairs: 1 receptionist, queue builds when faster than processing
-        # If spawn_interval < avg_reception, queue builds
-        if spawn_interval < avg_reception:
-            reception_queue = int((avg_reception - spawn_interval) * customers / avg_reception) + 1
-        else:
-            reception_queue = 1
-        reception_chairs = min(reception_queue, max_simultaneous // 2)
-        
-        # Waiting chairs: depends on bed availability
-        # If customers arrive faster than beds can process
-        arrivals_per_treatment = avg_treatment / spawn_interval
-        waiting_chairs = max(2, int(arrivals_per_treatment * 1.5))
-        waiting_chairs = min(waiting_chairs, beds * 2)  # Cap at 2x beds
-        
-        # Cashier chairs: similar to reception
-        if spawn_interval < avg_cashier:
-            cashier_queue = int((avg_cashier - spawn_interval) * customers / avg_cashier) + 1
-        else:
-            cashier_queue = 1
-        cashier_chairs = min(cashier_queue, max_simultaneous // 3)
-        
-        print(f"{grade:>5} | {customers:>9} | {beds:>4} | {spawn_interval:>7.1f}s | {max_simultaneous:>7} | {reception_chairs:>9} | {waiting_chairs:>7} | {cashier_chairs:>7} | {bed_capacity:>7}")
-        
-        recommendations.append({
-            'grade': grade,
-            'customers': customers,
-            'beds': beds,
-            'max_simultaneous': max_simultaneous,
-            'reception_chairs': reception_chairs,
-            'waiting_chairs': waiting_chairs,
-            'cashier_chairs': cashier_chairs,
-            'bed_capacity': bed_capacity,
-        })
+    recommendations = theoretical_recommendations()
+    print("\n".join(
+        f"{r['grade']:>5} | {r['customers']:>9} | {r['beds']:>4} | {r['spawn_interval']:>7.1f}s | {r['max_simultaneous']:>7} | {r['reception_chairs']:>9} | {r['waiting_chairs']:>7} | {r['cashier_chairs']:>7} | {r['bed_capacity']:>7}"
+        for r in recommendations
+    ))
     
     return recommendations
 
@@ -257,6 +367,17 @@ def main():
             shortage = r['customers'] - r['bed_capacity']
             print(f"  Grade {r['grade']}: Bed capacity ({r['bed_capacity']}) < Customers ({r['customers']})")
             print(f"           → {shortage} customers may leave due to long wait")
+    
+    # Monte Carlo check of the recommendations
+    num_runs = 10
+    simulated = simulate_all_grades(num_runs)
+    print("\n" + "=" * 80)
+    print(f"SIMULATION ({num_runs} runs per grade, worst case)")
+    print("=" * 80)
+    print(f"{'Grade':>5} | {'MaxCustomers':>12} | {'Reception':>9} | {'Waiting':>7} | {'Cashier':>7} | {'Served':>7} | {'Left':>7}")
+    print("-" * 80)
+    for grade, r in simulated.items():
+        print(f"{grade:>5} | {r['max_simultaneous']:>12} | {r['max_reception']:>9} | {r['max_waiting']:>7} | {r['max_cashier']:>7} | {r['avg_served']:>7.1f} | {r['avg_left']:>7.1f}")
 
 if __name__ == "__main__":
     main()
@@ -7,17 +7,18 @@ sim = SalonSimulator(config={
     'verbose': False,
 })
 
+# run() already steps simulate_day + try_upgrade and flags upgrades,
+# so drive the 30 days in one call and only format the results here
+results = sim.run(max_days=30)
+
 print("Day | G | * | Cust | Max | Capacity | Review | Total | Notes")
 print("-" * 70)
 
-for day in range(1, 31):
-    result = sim.simulate_day()
-    upgraded, _ = sim.try_upgrade()
-    
+for result in results:
     notes = []
-    if upgraded:
-        notes.append(f"->G{sim.state.grade}")
-    if result['today_review'] < 0:
+    if result.upgraded:
+        notes.append(f"->G{result.grade + 1}")
+    if result.today_review < 0:
         notes.append("NEGATIVE!")
     
-    print(f"{day:3} | {result['grade']} | {result['stars']:2} | {result['customers']:4} | {result['max_customers']:3} | - | {result['today_review']:+6} | {result['review_total']:6} | {' '.join(notes)}")
+    print(f"{result.day:3} | {result.grade} | {result.stars:2} | {result.customers:4} | {result.max_customers:3} | - | {result.today_review:+6} | {result.review_total:6} | {' '.join(notes)}")
@@ -1,11 +1,21 @@
 # Hair Removal Salon Simulator
 # ゲームバランス・収益シミュレーター
 
+import csv
+import os
 import random
+import sys
 from dataclasses import dataclass, field
-from typing import List, Dict, Tuple
-from enum import Enum
+from typing import List, Dict, Optional, Tuple
+from enum import IntEnum
+from operator import itemgetter
+import bisect
+import collections
+import functools
+import itertools
 import math
+import multiprocessing
+import types
 
 # ============================================
 # 定数定義 (★30段階版)
@@ -55,7 +65,14 @@ TIER_GRADE_REQUIREMENT = {
     "Richest": 5,
 }
 
-class WealthLevel(Enum):
+# (必要グレード, 必要星, ランク情報) を CUSTOMER_RANKS の逆順で保持
+# 後ろのランクほど上位なので、先頭から見て最初に条件を満たしたものが最高ランク
+_CUSTOMER_RANKS_BEST_FIRST = tuple(
+    (TIER_GRADE_REQUIREMENT[rank_data[1]], rank_data[6], rank_data)
+    for rank_data in reversed(CUSTOMER_RANKS)
+)
+
+class WealthLevel(IntEnum):
     """互換性のために残す (内部では CUSTOMER_RANKS を使用)"""
     POOREST = 0
     POOR = 1
@@ -63,7 +80,7 @@ class WealthLevel(Enum):
     RICH = 3
     RICHEST = 4
 
-class StaffRank(Enum):
+class StaffRank(IntEnum):
     STUDENT = 0       # 大学生
     NEWBIE = 1        # 新卒社員
     REGULAR = 2       # 中堅社員
@@ -123,6 +140,24 @@ STAFF_DAILY_SALARY = {
     StaffRank.PRO: 700,       # 300 -> 700
 }
 
+# 高速参照用テーブル (IntEnumで直接インデックス、タプルキーのハッシュを回避)
+# _STAFF_SUCCESS_TABLE[wealth][rank]
+_STAFF_SUCCESS_TABLE = tuple(
+    tuple(STAFF_SUCCESS_RATE.get((wealth, rank), 0.5) for rank in StaffRank)
+    for wealth in WealthLevel
+)
+_STAFF_REVIEW_MULTIPLIER_TABLE = tuple(STAFF_REVIEW_MULTIPLIER[rank] for rank in StaffRank)
+_STAFF_DAILY_SALARY_TABLE = tuple(STAFF_DAILY_SALARY[rank] for rank in StaffRank)
+
+# CUSTOMER_RANKSのティア名 → WealthLevel
+_TIER_TO_WEALTH = {
+    "Poorest": WealthLevel.POOREST,
+    "Poor": WealthLevel.POOR,
+    "Normal": WealthLevel.NORMAL,
+    "Rich": WealthLevel.RICH,
+    "Richest": WealthLevel.RICHEST,
+}
+
 
 # 顧客分布 (星×レビュースコア) → 各富裕層の割合
 # レビュースコア区間: 0-20, 20-50, 50-80, 80-100
@@ -178,6 +213,30 @@ CUSTOMER_DISTRIBUTION = {
     },
 }
 
+# レビュースコア区間: 境界値で二分探索して区間番号 (0-3) を得る
+_SCORE_BRACKET_EDGES = (20, 50, 80)
+_SCORE_BRACKETS = (0, 20, 50, 80)
+
+def _cumulative_choice_table(dist: dict) -> tuple:
+    """分布を random.choices の cum_weights 用 (富裕層タプル, 累積確率タプル) に変換
+    
+    合計が1に満たない分は最貧層 (従来のフォールバック) として末尾に補う。
+    """
+    wealths = tuple(dist.keys())
+    cumulative = tuple(itertools.accumulate(dist.values()))
+    if cumulative[-1] < 1.0:
+        wealths += (WealthLevel.POOREST,)
+        cumulative += (1.0,)
+    return wealths, cumulative
+
+# 顧客分布の累積確率テーブル: 星 → 区間番号順の (富裕層タプル, 累積確率タプル)
+# (タプルキーを作らずに 星 → 区間番号 で引けるようにする)
+_CUSTOMER_DIST_CUMULATIVE = {
+    stars: tuple(_cumulative_choice_table(brackets[bracket]) for bracket in _SCORE_BRACKETS)
+    for stars, brackets in CUSTOMER_DISTRIBUTION.items()
+}
+_DEFAULT_DIST_CUMULATIVE = ((WealthLevel.POOREST,), (1.0,))
+
 # プラン料金 (富裕層別)
 PLAN_PRICES = {
     WealthLevel.POOREST: {"chest": 20, "abs": 30, "armpits": 40},
@@ -187,6 +246,9 @@ PLAN_PRICES = {
     WealthLevel.RICHEST: {"full_no_beard": 350, "full_with_beard": 420},
 }
 
+# プラン料金の価格テーブル: _PLAN_PRICE_TABLE[wealth] → 価格タプル (プラン名は不要)
+_PLAN_PRICE_TABLE = tuple(tuple(PLAN_PRICES[wealth].values()) for wealth in WealthLevel)
+
 # グレード設定 - ローンが必要になるようupgrade_cost/rent上昇
 # required_stars: 5刻みでグレードアップ (G2=★5, G3=★10, G4=★15, G5=★20, G6=★25, G7=★30)
 # max_customers: 600秒基準の値 (450秒では ×0.75 = G6で214人程度)
@@ -212,6 +274,9 @@ REVIEW_THRESHOLDS = {
     21: 52500,  22: 63000,  23: 75000,  24: 90000,  25: 107000,
     26: 129000, 27: 154000, 28: 182000, 29: 214000, 30: 250000,
 }
+# 星レベル昇順に並べた星と閾値 (update_star_ratingで二分探索する)
+_THRESHOLD_STARS = tuple(sorted(REVIEW_THRESHOLDS))
+_THRESHOLD_VALUES = tuple(REVIEW_THRESHOLDS[stars] for stars in _THRESHOLD_STARS)
 
 
 
@@ -232,8 +297,22 @@ AD_CONFIG = {
     "influencer": {"cost": 200000, "attraction_boost": 250, "duration": 5, "star_req": 27, "decay": 40},
 }
 
+def _ad_efficiency(ad_config: dict) -> float:
+    """コスト効率 = attraction_boost / cost (無料は最優先)"""
+    if ad_config["cost"] == 0:
+        return 100.0
+    return (ad_config["attraction_boost"] * ad_config["duration"]) / ad_config["cost"] * 100
+
+# 広告の (名前, 必要星レベル, コスト効率) — "none" を除いてimport時に計算
+_AD_EFFICIENCY = tuple(
+    (ad_name, ad_config["star_req"], _ad_efficiency(ad_config))
+    for ad_name, ad_config in AD_CONFIG.items()
+    if ad_name != "none"
+)
+
 # 集客率の日次変動 (ランダム要素)
 # 集客率の日次変動 (ランダム要素)
+_DAILY_VARIANCES = tuple(range(-3, 4))  # 集客度の日次変動 (+-3ポイント、一様)
 # CUSTOMER_GAUGE_DAILY_VARIANCE = 0.08  # +-8%の変動 (未使用: random.randint(-3, 3)が使用されています)
 
 # アップセル設定
@@ -316,6 +395,33 @@ STAFF_UNLOCK = {
     StaffRank.PRO: 25,
 }
 
+# グレードごとの雇用/昇格ランク (grade - 1 でインデックス、G1からMAX_GRADEまで)
+# G1-2: 大学生, G3: 新卒, G4: 中堅, G5: ベテラン, G6-7: プロ
+_HIRE_RANK_BY_GRADE = (
+    StaffRank.STUDENT,
+    StaffRank.STUDENT,
+    StaffRank.NEWBIE,
+    StaffRank.REGULAR,
+    StaffRank.VETERAN,
+    StaffRank.PRO,
+    StaffRank.PRO,
+)
+
+def _grade_tool_cost(grade: int) -> int:
+    """グレードアップ時に全ベッド分自動購入するツールの費用"""
+    tool_cost = 0
+    if grade in TOOL_CONFIG:
+        for tool in TOOL_CONFIG[grade].values():
+            tool_cost += tool["cost"]
+    return tool_cost * GRADE_CONFIG[grade]["beds"]
+
+# グレードアップに必要なツール費用と総コスト (アップグレード費用 + ツール一式)
+# gradeでそのままインデックス、0番と1番は未使用
+_GRADE_TOOL_COST = (0, 0) + tuple(_grade_tool_cost(grade) for grade in range(2, MAX_GRADE + 1))
+_GRADE_TOTAL_COST = (0, 0) + tuple(
+    GRADE_CONFIG[grade]["upgrade_cost"] + _GRADE_TOOL_COST[grade] for grade in range(2, MAX_GRADE + 1)
+)
+
 
 # ローン設定 (グレード別) - 高コスト化に対応して借入額増加
 # max_amount: 最大借入額, daily_rate: 日利(単利), term_days: 返済日数, grade_req: 必要グレード
@@ -327,6 +433,9 @@ LOAN_CONFIG = {
     "elite": {"max_amount": 2000000, "daily_rate": 0.015, "term_days": 10, "grade_req": 5},
 }
 
+# 借入額の大きい順に並べたローン (借入時はこの順で満額借りる)
+_LOANS_BY_AMOUNT = tuple(sorted(LOAN_CONFIG.items(), key=lambda item: -item[1]["max_amount"]))
+
 # ローンは最大3種類まで同時借入可能（同じ種類は重複不可）
 MAX_ACTIVE_LOANS = 3
 
@@ -335,55 +444,68 @@ MAX_ACTIVE_LOANS = 3
 # データクラス
 # ============================================
 
-@dataclass
+@dataclass(slots=True)
 class Staff:
     rank: StaffRank
     
     def get_success_rate(self, customer_wealth: WealthLevel) -> float:
-        return STAFF_SUCCESS_RATE.get((customer_wealth, self.rank), 0.5)
+        return _STAFF_SUCCESS_TABLE[customer_wealth][self.rank]
     
     def get_review_multiplier(self) -> float:
-        return STAFF_REVIEW_MULTIPLIER[self.rank]
+        return _STAFF_REVIEW_MULTIPLIER_TABLE[self.rank]
     
     def get_daily_salary(self) -> int:
-        return STAFF_DAILY_SALARY[self.rank]
+        return _STAFF_DAILY_SALARY_TABLE[self.rank]
 
-@dataclass
+@dataclass(slots=True)
 class Customer:
     wealth: WealthLevel
     plan_price: int
     
     @staticmethod
-    def generate(star_rating: int, review_score: int) -> 'Customer':
+    def _wealth_distribution(star_rating: int, review_score: int) -> tuple:
+        """(富裕層タプル, 累積確率タプル) を取得"""
+        by_bracket = _CUSTOMER_DIST_CUMULATIVE.get(star_rating)
+        if by_bracket is None:
+            return _DEFAULT_DIST_CUMULATIVE
         # レビュースコアから区間を決定
-        if review_score < 20:
-            score_bracket = 0
-        elif review_score < 50:
-            score_bracket = 20
-        elif review_score < 80:
-            score_bracket = 50
-        else:
-            score_bracket = 80
-        
+        return by_bracket[bisect.bisect_right(_SCORE_BRACKET_EDGES, review_score)]
+    
+    @staticmethod
+    def generate(star_rating: int, review_score: int, rng: random.Random = None) -> 'Customer':
+        """顧客を1人生成 (rng省略時はrandomモジュールの共有乱数を使用)"""
+        if rng is None:
+            rng = random
         # 分布から富裕層を決定
-        dist = CUSTOMER_DISTRIBUTION.get(star_rating, {}).get(score_bracket, {WealthLevel.POOREST: 1.0})
-        r = random.random()
-        cumulative = 0
-        wealth = WealthLevel.POOREST
-        for w, prob in dist.items():
-            cumulative += prob
-            if r <= cumulative:
-                wealth = w
-                break
+        wealths, cumulative = Customer._wealth_distribution(star_rating, review_score)
+        wealth = rng.choices(wealths, cum_weights=cumulative)[0]
         
-        # プランを選択
-        plans = PLAN_PRICES.get(wealth, {"default": 20})
-        plan_name = random.choice(list(plans.keys()))
-        price = plans[plan_name]
+        # プランを選択 (使うのは料金だけなので価格タプルから直接選ぶ)
+        price = rng.choice(_PLAN_PRICE_TABLE[wealth])
         
         return Customer(wealth=wealth, plan_price=price)
+    
+    @staticmethod
+    def generate_batch(star_rating: int, review_score: int, n: int,
+                       rng: random.Random = None) -> List['Customer']:
+        """n人分の顧客をまとめて生成 (分布の取得は1回、富裕層の乱数は一括で引く)"""
+        if rng is None:
+            rng = random
+        wealths, cumulative = Customer._wealth_distribution(star_rating, review_score)
+        choices = rng.choices
+        customer_wealths = choices(wealths, cum_weights=cumulative, k=n)
+        
+        # プランは富裕層ごとに人数分をまとめて抽選し、順に割り当てる
+        plan_prices = {
+            wealth: iter(choices(_PLAN_PRICE_TABLE[wealth], k=count))
+            for wealth, count in collections.Counter(customer_wealths).items()
+        }
+        return [
+            Customer(wealth=wealth, plan_price=next(plan_prices[wealth]))
+            for wealth in customer_wealths
+        ]
 
-@dataclass
+@dataclass(slots=True)
 class Loan:
     """ローン (単利計算)"""
     loan_type: str  # ローン種類名
@@ -414,53 +536,159 @@ class Loan:
     
     def make_payment(self, amount: int = 0) -> int:
         """返済を行う。amount=0なら最低額、それ以上なら繰り上げ返済"""
-        if self.remaining_principal <= 0:
+        remaining_principal = self.remaining_principal
+        if remaining_principal <= 0:
             return 0
         
-        # 利息を加算
-        self.accrue_daily_interest()
+        # 利息を加算 (accrue_daily_interest と同じ計算をインライン化)
+        accrued_interest = self.accrued_interest + int(remaining_principal * self.daily_rate)
         
-        # 返済額決定
-        min_payment = self.get_minimum_payment()
-        actual_payment = max(min_payment, amount) if amount > 0 else min_payment
-        
-        # 利息から先に支払い
-        if actual_payment >= self.accrued_interest:
-            actual_payment -= self.accrued_interest
-            interest_paid = self.accrued_interest
-            self.accrued_interest = 0
+        # 返済額決定 (get_minimum_payment と同じ計算をインライン化)
+        remaining_days = self.remaining_days
+        if remaining_days <= 0:
+            min_payment = remaining_principal + accrued_interest
         else:
-            interest_paid = actual_payment
-            self.accrued_interest -= actual_payment
-            actual_payment = 0
+            min_payment = remaining_principal // remaining_days + accrued_interest
+        actual_payment = max(min_payment, amount)
         
-        # 残りを元金返済
-        principal_paid = min(actual_payment, self.remaining_principal)
-        self.remaining_principal -= principal_paid
+        # 利息から先に支払い (最低返済額は利息以上なので利息は必ず完済)
+        principal_paid = min(actual_payment - accrued_interest, remaining_principal)
         
-        self.remaining_days -= 1
-        return interest_paid + principal_paid
+        # 残りを元金返済
+        self.accrued_interest = 0
+        self.remaining_principal = remaining_principal - principal_paid
+        self.remaining_days = remaining_days - 1
+        return accrued_interest + principal_paid
     
     def is_paid_off(self) -> bool:
         return self.remaining_principal <= 0
 
-@dataclass
+# 施術時間短縮率の降順 (同率なら必要星レベルの低い順) に並べたツール
+_TOOLS_BY_REDUCTION = tuple(sorted(
+    TOOL_CONFIG.items(), key=lambda item: (-item[1]["time_reduction"], item[1]["star_req"])
+))
+
+@functools.lru_cache(maxsize=256)
+def _best_customer_rank(grade: int, star_level: int) -> tuple:
+    """グレードと星レベルで来店する最高ランクのお客情報"""
+    for tier_grade, star_req, rank_data in _CUSTOMER_RANKS_BEST_FIRST:
+        # グレード確認 & 星レベル確認
+        if grade >= tier_grade and star_req <= star_level:
+            return rank_data
+    return CUSTOMER_RANKS[0]  # フォールバック
+
+# 星レベルで決まる利用可能ツール・アイテム・広告 (星レベルごとに1回だけ計算してキャッシュ)
+@functools.lru_cache(maxsize=None)
+def _max_reduction_for_star(star_level: int) -> float:
+    """星レベルで使用可能なツールの最高施術時間短縮率"""
+    # 短縮率の高い順に見て、最初に使用可能なツールが最高値
+    for name, config in _TOOLS_BY_REDUCTION:
+        if config["star_req"] <= star_level:
+            return config["time_reduction"]
+    return 0.0
+
+@functools.lru_cache(maxsize=None)
+def _treatments_per_bed(operating_time: int, avg_treatment_time: float, star_level: int) -> float:
+    """1ベッドあたりの1日の施術可能数 (ツール短縮後の平均施術時間で割る)"""
+    # 施術短縮系はツールのみになったため、ITEM_CONFIGのtime_reductionは削除されました
+    # 平均施術時間はツールの性能に依存すべきだが、ここでは簡易的にreductionを使用
+    effective_treatment_time = avg_treatment_time * (1.0 - _max_reduction_for_star(star_level))
+    effective_treatment_time = max(1.0, effective_treatment_time)
+    return operating_time / effective_treatment_time
+
+@functools.lru_cache(maxsize=None)
+def _items_for_star(star_level: int, item_type: str) -> tuple:
+    """星レベルで利用可能な指定タイプのアイテム (キャッシュを共有するため読み取り専用)"""
+    return tuple(
+        types.MappingProxyType({"name": name, **config})
+        for name, config in ITEM_CONFIG.items()
+        if config["type"] == item_type and config["star_req"] <= star_level
+    )
+
+@functools.lru_cache(maxsize=None)
+def _item_rolls_for_star(star_level: int, item_type: str) -> tuple:
+    """_items_for_star を (コスト, 価格, レビューボーナス) のタプルにしたもの (施術カーネル用)"""
+    return tuple(
+        (item["cost"], item["price"], item["review_bonus"])
+        for item in _items_for_star(star_level, item_type)
+    )
+
+@functools.lru_cache(maxsize=None)
+def _tools_for_star(star_level: int) -> tuple:
+    """星レベルで利用可能なツール (キャッシュを共有するため読み取り専用)"""
+    return tuple(
+        types.MappingProxyType({"name": name, **config})
+        for name, config in TOOL_CONFIG.items()
+        if config["star_req"] <= star_level
+    )
+
+@functools.lru_cache(maxsize=None)
+def _ads_for_star(star_level: int) -> tuple:
+    """星レベルで利用可能な広告"""
+    return tuple(name for name, config in AD_CONFIG.items() if config["star_req"] <= star_level)
+
+@functools.lru_cache(maxsize=None)
+def _ads_by_efficiency(star_level: int) -> tuple:
+    """星レベルで利用可能な広告名をコスト効率の高い順に (同効率なら定義順)"""
+    available_ads = [(ad_name, efficiency) for ad_name, star_req, efficiency in _AD_EFFICIENCY if star_req <= star_level]
+    return tuple(ad_name for ad_name, _ in sorted(available_ads, key=itemgetter(1), reverse=True))
+
+
+@dataclass(slots=True)
 class SalonState:
-    grade: int = 1
+    """サロンの状態 (グレードは読み取り専用、変更は upgrade_grade のみ)"""
+    # グレード (1から開始)。グレード設定のキャッシュと食い違わないよう直接代入させない
+    _grade: int = field(default=1, init=False)
     money: int = 1000  # 初期資金
     cumulative_review: int = 0
     star_level: int = 1  # ★1-30
     attraction_level: int = 50  # 集客度 (G1上限100で50開始)
     day: int = 1
+    tool_grade: int = 1  # 購入済みツール一式のグレード
     staff: List[Staff] = field(default_factory=list)
     loans: List[Loan] = field(default_factory=list)
-    active_ads: List[dict] = field(default_factory=list)
+    # 実施中の広告 (構造体配列: 同じ添字が同じ広告)
+    ad_types: List[str] = field(default_factory=list)  # 広告種類
+    ad_remaining: List[int] = field(default_factory=list)  # 残り日数
+    ad_boosts: List[int] = field(default_factory=list)  # 現在の集客度ブースト
+    ad_decays: List[int] = field(default_factory=list)  # 日次減衰ポイント
     
     # 統計
     total_revenue: int = 0
     total_expenses: int = 0
     customers_served: int = 0
     
+    # 現在のグレードの設定値キャッシュ (グレード変更時に _refresh_grade_cache で更新)
+    _beds: int = field(default=0, init=False, repr=False)
+    _staff_slots: int = field(default=0, init=False, repr=False)
+    _rent: int = field(default=0, init=False, repr=False)
+    _required_stars: int = field(default=0, init=False, repr=False)
+    _attraction_cap: int = field(default=0, init=False, repr=False)
+    _max_customers_base: int = field(default=0, init=False, repr=False)
+    
+    def __post_init__(self):
+        self._refresh_grade_cache()
+    
+    @property
+    def grade(self) -> int:
+        """現在のグレード"""
+        return self._grade
+    
+    def upgrade_grade(self, new_grade: int):
+        """グレードを変更し、グレード設定のキャッシュを更新"""
+        self._grade = new_grade
+        self._refresh_grade_cache()
+    
+    def _refresh_grade_cache(self):
+        """GRADE_CONFIGから現在のグレードの値を読み込んでキャッシュ"""
+        config = GRADE_CONFIG[self._grade]
+        self._beds = config["beds"]
+        self._staff_slots = config["staff_slots"]
+        self._rent = config["rent"]
+        self._required_stars = config["required_stars"]
+        self._attraction_cap = config["attraction_cap"]
+        self._max_customers_base = config["max_customers"]
+    
     @property
     def star_rating(self) -> int:
         """互換性のためのエイリアス"""
@@ -472,76 +700,48 @@ class SalonState:
     
     def get_total_time_reduction(self) -> float:
         """現在使用可能なツールの最高施術時間短縮率を取得"""
-        max_reduction = 0.0
-        for name, config in TOOL_CONFIG.items():
-            if config["star_req"] <= self.star_level:
-                if config["time_reduction"] > max_reduction:
-                    max_reduction = config["time_reduction"]
-        return max_reduction
-    
-    def get_available_items(self, item_type: str) -> List[dict]:
-        """指定タイプの利用可能なアイテムを取得 (星レベルでフィルタ)"""
-        available = []
-        for name, config in ITEM_CONFIG.items():
-            if config["type"] == item_type and config["star_req"] <= self.star_level:
-                available.append({"name": name, **config})
-        return available
-    
-    def get_available_tools(self) -> List[dict]:
-        """利用可能なツールを取得"""
-        available = []
-        for name, config in TOOL_CONFIG.items():
-            if config["star_req"] <= self.star_level:
-                available.append({"name": name, **config})
-        return available
-    
-    def get_available_ads(self) -> List[str]:
-        """利用可能な広告を取得"""
-        available = []
-        for name, config in AD_CONFIG.items():
-            if config["star_req"] <= self.star_level:
-                available.append(name)
-        return available
+        return _max_reduction_for_star(self.star_level)
+    
+    def get_available_items(self, item_type: str) -> tuple:
+        """指定タイプの利用可能なアイテムを取得 (星レベルでフィルタ、キャッシュ済みタプル)"""
+        return _items_for_star(self.star_level, item_type)
+    
+    def get_available_tools(self) -> tuple:
+        """利用可能なツールを取得 (キャッシュ済みタプル)"""
+        return _tools_for_star(self.star_level)
+    
+    def get_available_ads(self) -> tuple:
+        """利用可能な広告を取得 (キャッシュ済みタプル)"""
+        return _ads_for_star(self.star_level)
     
     def get_current_customer_rank(self) -> tuple:
         """現在の星レベルとグレードから最高ランクのお客情報を取得"""
-        best_rank = CUSTOMER_RANKS[0]  # フォールバック
-        for rank_data in CUSTOMER_RANKS:
-            rank_name, tier, sublevel, price, budget_min, budget_max, star_req = rank_data
-            tier_grade = TIER_GRADE_REQUIREMENT[tier]
-            # グレード確認 & 星レベル確認
-            if self.grade >= tier_grade and star_req <= self.star_level:
-                best_rank = rank_data
-        return best_rank
+        return _best_customer_rank(self.grade, self.star_level)
     
     def get_beds(self) -> int:
-        return GRADE_CONFIG[self.grade]["beds"]
+        return self._beds
     
     def get_staff_slots(self) -> int:
-        return GRADE_CONFIG[self.grade]["staff_slots"]
+        return self._staff_slots
     
     def get_rent(self) -> int:
-        return GRADE_CONFIG[self.grade]["rent"]
+        return self._rent
     
     def get_required_stars(self) -> int:
-        return GRADE_CONFIG[self.grade]["required_stars"]
+        return self._required_stars
     
     def get_attraction_cap(self) -> int:
         """現在のグレードの集客度上限を取得"""
-        return GRADE_CONFIG[self.grade]["attraction_cap"]
+        return self._attraction_cap
     
     def get_max_customers(self, operating_time: int = 450) -> int:
         """現在のグレードに基づく最大顧客数を取得
         
         GRADE_CONFIGのmax_customersは600秒基準かつ施設アイテムブースト込みの値
         """
-        base_max = GRADE_CONFIG[self.grade]["max_customers"]
-        
-        # 日の長さに応じた係数 (600秒 = 1.0, 450秒 = 0.75)
-        day_length_coefficient = operating_time / 600.0
-        
-        effective_max = int(base_max * day_length_coefficient)
-        return effective_max
+        # 日の長さに応じてスケール (600秒 = 1.0, 450秒 = 0.75)
+        # 浮動小数の係数を介さず整数演算で切り捨て
+        return int(self._max_customers_base * operating_time // 600)
     
     def get_current_customers(self, operating_time: int = 450) -> int:
         """現在の集客度から実際の集客数を計算"""
@@ -552,19 +752,119 @@ class SalonState:
     
     def update_star_rating(self):
         """レビュー累積値から星レベルを更新 (互換性のため名前維持)"""
-        for stars, threshold in sorted(REVIEW_THRESHOLDS.items(), reverse=True):
-            if self.cumulative_review >= threshold:
-                self.star_level = stars
-                break
+        # 閾値 <= 累積レビュー となる最後の星レベル (該当なしなら据え置き)
+        idx = bisect.bisect_right(_THRESHOLD_VALUES, self.cumulative_review)
+        if idx:
+            self.star_level = _THRESHOLD_STARS[idx - 1]
+
+
+@dataclass(slots=True)
+class DayResult:
+    """1日分のシミュレーション結果"""
+    day: int
+    grade: int
+    stars: int
+    revenue: int
+    expenses: int
+    net: int
+    money: int
+    # 詳細経費
+    expense_ad: int
+    expense_rent: int
+    expense_staff: int
+    expense_loan: int
+    expense_items: int
+    # スタッフ情報
+    staff_count: int
+    # ローン情報
+    active_loans: int
+    new_loan: Optional[str]
+    # 広告情報
+    new_ad: Optional[str]
+    active_ads_count: int
+    ad_boost: int
+    # 顧客情報
+    customers: int
+    max_customers: int
+    attraction_level: int
+    attraction_cap: int
+    # レビュー情報
+    today_review: int
+    review_total: int
+    # グレードアップ (run() が試行後に設定)
+    upgraded: bool = False
+    loan_info: Optional[dict] = None
+    borrowed_amount: int = 0
 
 
 # ============================================
 # シミュレーション
 # ============================================
 
+def _serve_customers(rng: random.Random, n: int, staff_profiles: list,
+                     plan_price: int, budget_min: int, budget_max: int,
+                     reception_items: tuple, register_items: tuple) -> Tuple[int, int, int]:
+    """処理できた客n人分の施術をまとめて計算 (売上, アイテム経費, レビュー合計)
+    
+    1日の状態に依存する値は呼び出し側で確定させ、ここでは素のデータだけを扱う。
+    スタッフは (成功率, レビュー倍率) のタプル (全員同じなら1要素でよい)、
+    アイテムは (コスト, 価格, レビューボーナス) のタプル。
+    """
+    # 整数の一様乱数は randint ではなく lo + int(random() * 幅) で引く (1回のC呼び出しで済む)
+    rand = rng.random
+    budget_span = budget_max - budget_min + 1
+    revenue = 0
+    item_expense = 0
+    review_total = 0
+    # 成功した客ごとの担当スタッフのレビュー倍率 (アイテムは最後にまとめて抽選)
+    success_multipliers = []
+    
+    # スタッフ割り当て（ランダム）は全員分をまとめて抽選 (1種類なら抽選不要)
+    if len(staff_profiles) > 1:
+        assigned_staff = rng.choices(staff_profiles, k=n)
+    else:
+        assigned_staff = itertools.repeat(staff_profiles[0], n)
+    
+    for success_rate, review_multiplier in assigned_staff:
+        # 成功率100%なら判定の乱数を引かない
+        success = success_rate >= 1.0 or rand() < success_rate
+        
+        if success:
+            # 追加予算は支払いが発生する成功時だけ抽選
+            additional_budget = budget_min + int(rand() * budget_span)
+            revenue += plan_price + additional_budget
+            success_multipliers.append(review_multiplier)
+            
+            # 基本レビュー
+            roll = rand()
+            if roll < 0.80:
+                base_review = 50
+            elif roll < 0.95:
+                base_review = 30 + int(rand() * 20)  # 30-49
+            else:
+                base_review = -10 + int(rand() * 40)  # -10-29
+            review_total += int(base_review * review_multiplier)
+        else:
+            # 失敗時
+            base_review = -50 + int(rand() * 51)  # -50-0
+            review_total += int(base_review * review_multiplier)
+    
+    # アイテム適用 (成功した客ごとに受付1つ + レジ1つ)
+    # 1人ずつchoiceせず、成功人数分をchoicesで一括抽選
+    n_success = len(success_multipliers)
+    for items in (reception_items, register_items):
+        if not items or not n_success:
+            continue
+        for (cost, price, review_bonus), review_multiplier in zip(rng.choices(items, k=n_success), success_multipliers):
+            item_expense += cost
+            revenue += price
+            review_total += int(review_bonus * review_multiplier)
+    
+    return revenue, item_expense, review_total
+
+
 class SalonSimulator:
     def __init__(self, config: dict = None):
-        self.state = SalonState()
         self.config = config or {}
         
         # シミュレーション設定
@@ -572,42 +872,46 @@ class SalonSimulator:
         self.avg_treatment_time = self.config.get("avg_treatment_time", 15)  # 平均施術時間
         self.use_loans = self.config.get("use_loans", False)
         self.verbose = self.config.get("verbose", False)
+        # Falseなら日次結果を作らない (verbose時は表示に必要なので常に作る)
+        self.collect_results = self.verbose or self.config.get("collect_results", True)
+        
+        self.reset(self.config.get("seed"))
+    
+    def reset(self, seed=None):
+        """設定はそのままに、サロンの状態と乱数生成器を初期化 (同じ設定で繰り返し実行する用)"""
+        self.state = SalonState()
+        # シミュレーターごとの乱数生成器 (seed指定で再現可能、プロセス間で乱数列を共有しない)
+        self.rng = random.Random(seed)
         
         # 初期スタッフを追加 (これがいないとキャパ0で全員帰る)
-        if not self.state.staff:
-            self.state.staff.append(Staff(rank=StaffRank.REGULAR))
+        self.state.staff.append(Staff(rank=StaffRank.REGULAR))
+    
+    def _rank_ads(self, exclude_types: list = None, limit: int = 3) -> List[str]:
+        """現在の星レベルで使用可能な広告のうちコスト効率上位limit個を効率順に取得"""
+        ranked_ads = _ads_by_efficiency(self.state.star_level)
+        if not exclude_types:
+            return list(ranked_ads[:limit])
+        # 星レベルごとに効率順で事前ソート済みなので、除外して先頭から取るだけ
+        return [ad_name for ad_name in ranked_ads if ad_name not in exclude_types][:limit]
     
     def _select_best_ad(self, exclude_types: list = None) -> str:
         """現在の星レベルで使用可能な最適な広告を選択"""
-        if exclude_types is None:
-            exclude_types = []
-        available_ads = []
-        for ad_name, ad_config in AD_CONFIG.items():
-            if ad_name == "none" or ad_name in exclude_types:
-                continue
-            if ad_config["star_req"] <= self.state.star_level:
-                # コスト効率 = attraction_boost / cost (無料は最優先)
-                if ad_config["cost"] == 0:
-                    efficiency = 100.0
-                else:
-                    efficiency = (ad_config["attraction_boost"] * ad_config["duration"]) / ad_config["cost"] * 100
-                available_ads.append((ad_name, efficiency))
-        
-        if not available_ads:
+        ranked_ads = self._rank_ads(exclude_types)
+        if not ranked_ads:
             return None
-        
-        # 効率順にソートして、ランダム要素を加える
-        available_ads.sort(key=lambda x: x[1], reverse=True)
         # 上位3つからランダム選択
-        top_ads = available_ads[:min(3, len(available_ads))]
-        return random.choice(top_ads)[0]
+        return self.rng.choice(ranked_ads[:3])
     
-    def simulate_day(self) -> dict:
-        """1日をシミュレート"""
+    def simulate_day(self, daily_variance: int = None) -> Optional[DayResult]:
+        """1日をシミュレート (daily_variance省略時はその場で抽選)"""
+        # 状態とグレード由来の値は1日の中で変わらないため、最初にローカルへ束縛
+        state = self.state
+        grade = state.grade
+        cap = state.get_attraction_cap()
+        max_customers = state.get_max_customers(self.operating_time)
+        
         daily_revenue = 0
         daily_expenses = 0
-        daily_customers = 0
-        daily_reviews = []
         
         # 詳細経費追跡
         expense_ad = 0
@@ -619,41 +923,45 @@ class SalonSimulator:
         new_ad_started = None
         
         # アクティブ広告の効果計算とdecay (集客度ポイント)
-        total_ad_boost = 0  # 広告による一時的集客度ブースト
-        ads_to_remove = []
-        for i, ad in enumerate(self.state.active_ads):
-            total_ad_boost += ad["current_boost"]
-            ad["current_boost"] -= AD_CONFIG[ad["type"]]["decay"]  # 日次減衰
-            ad["remaining"] -= 1
-            if ad["remaining"] <= 0 or ad["current_boost"] <= 0:
-                ads_to_remove.append(i)
-        
-        # 期限切れ広告を削除
-        for i in reversed(ads_to_remove):
-            self.state.active_ads.pop(i)
+        ad_types = state.ad_types
+        ad_remaining = state.ad_remaining
+        ad_boosts = state.ad_boosts
+        ad_decays = state.ad_decays
+        total_ad_boost = sum(ad_boosts)  # 広告による一時的集客度ブースト
+        # 日次減衰し、期限切れでない広告だけを前詰めで残す (インプレース圧縮)
+        kept = 0
+        for i in range(len(ad_types)):
+            boost = ad_boosts[i] - ad_decays[i]
+            remaining = ad_remaining[i] - 1
+            if remaining > 0 and boost > 0:
+                ad_types[kept] = ad_types[i]
+                ad_remaining[kept] = remaining
+                ad_boosts[kept] = boost
+                ad_decays[kept] = ad_decays[i]
+                kept += 1
+        del ad_types[kept:], ad_remaining[kept:], ad_boosts[kept:], ad_decays[kept:]
         
         # 新しい広告を購入 (最大3つまで、同種類は不可)
         # 集客度がMAXに近づくよう積極的に広告を購入
-        active_ad_types = [ad["type"] for ad in self.state.active_ads]
-        attraction_ratio = self.state.attraction_level / self.state.get_attraction_cap()
+        attraction_ratio = state.attraction_level / cap
         
         # 集客度が80%未満なら積極的に広告購入、3つまで購入可能
-        while len(self.state.active_ads) < 3:
-            if attraction_ratio >= 0.9 and len(self.state.active_ads) >= 1:
+        # 候補の順位付けは1回だけ行い、購入した広告を候補から外しながら上位3つから選ぶ
+        # (k本目の購入は上位k+2位までしか見ないため、それより下位は不要)
+        ranked_ads = self._rank_ads(exclude_types=ad_types, limit=3 - len(ad_types) + 2)
+        while len(ad_types) < 3 and ranked_ads:
+            if attraction_ratio >= 0.9 and len(ad_types) >= 1:
                 break  # 90%以上なら追加広告不要
-            best_ad = self._select_best_ad(exclude_types=active_ad_types)
-            if best_ad is None:
-                break
+            best_ad = self.rng.choice(ranked_ads[:3])
+            ranked_ads.remove(best_ad)
             ad_config = AD_CONFIG[best_ad]
             # 資金の20%以下なら購入（より積極的）
-            if ad_config["cost"] <= self.state.money * 0.2 or ad_config["cost"] == 0:
+            if ad_config["cost"] <= state.money * 0.2 or ad_config["cost"] == 0:
                 expense_ad += ad_config["cost"]
-                self.state.active_ads.append({
-                    "type": best_ad,
-                    "remaining": ad_config["duration"],
-                    "current_boost": ad_config["attraction_boost"]
-                })
-                active_ad_types.append(best_ad)
+                ad_types.append(best_ad)
+                ad_remaining.append(ad_config["duration"])
+                ad_boosts.append(ad_config["attraction_boost"])
+                ad_decays.append(ad_config["decay"])
                 total_ad_boost += ad_config["attraction_boost"]
                 if new_ad_started is None:
                     new_ad_started = best_ad
@@ -663,182 +971,139 @@ class SalonSimulator:
         daily_expenses += expense_ad
         
         # 家賃 (3日おき)
-        if self.state.day % 3 == 0:
-            expense_rent = self.state.get_rent()
+        if state.day % 3 == 0:
+            expense_rent = state.get_rent()
             daily_expenses += expense_rent
         
         # スタッフ給料
-        for staff in self.state.staff:
+        for staff in state.staff:
             expense_staff += staff.get_daily_salary()
         daily_expenses += expense_staff
         
-        # ローン返済
-        loans_to_remove = []
-        for i, loan in enumerate(self.state.loans):
-            payment = loan.make_payment()
-            expense_loan += payment
-            if loan.is_paid_off():
-                loans_to_remove.append(i)
-        for i in reversed(loans_to_remove):
-            self.state.loans.pop(i)
-        daily_expenses += expense_loan
+        # ローン返済 (ローンなしの日は何もしない)
+        # 返済と完済ローンの除去を1回の走査で行う
+        if state.loans:
+            outstanding_loans = []
+            for loan in state.loans:
+                expense_loan += loan.make_payment()
+                if loan.remaining_principal > 0:
+                    outstanding_loans.append(loan)
+            state.loans[:] = outstanding_loans
+            daily_expenses += expense_loan
         
         # 来客数計算 (集客度システム)
         # 広告効果は一時的に集客度を上げる（直接ポイント）
-        daily_variance = random.randint(-3, 3)  # +-3の日次変動
-        effective_attraction = self.state.attraction_level + total_ad_boost + daily_variance
-        effective_attraction = max(10, min(effective_attraction, self.state.get_attraction_cap()))
+        if daily_variance is None:
+            daily_variance = self.rng.randint(-3, 3)  # +-3の日次変動
+        effective_attraction = state.attraction_level + total_ad_boost + daily_variance
+        effective_attraction = max(10, min(effective_attraction, cap))
         
         # 集客度から集客数を計算
-        cap = self.state.get_attraction_cap()
-        max_customers = self.state.get_max_customers(self.operating_time)
         customer_ratio = effective_attraction / cap
         expected_customers = int(max_customers * customer_ratio)
         
         # 施術シミュレーション
-        beds = self.state.get_beds()
-        available_staff = len(self.state.staff)
+        beds = state.get_beds()
+        available_staff = len(state.staff)
         staff_beds = min(beds, available_staff) # プレイヤーベッド概念を一旦削除してスタッフ総力戦
         
         # 処理能力の計算 (Wait Timeout シミュレーション)
         # 1日の稼働時間(秒) / 平均施術時間(アイテム短縮後) * ベッド数
-        tool_reduction = self.state.get_total_time_reduction()
-        # 施術短縮系はツールのみになったため、ITEM_CONFIGのtime_reductionは削除されました
+        # 1ベッドあたりの施術数は稼働時間と星レベルだけで決まるためキャッシュ済み
+        daily_capacity = int(_treatments_per_bed(self.operating_time, self.avg_treatment_time, state.star_level) * staff_beds)
         
-        # 平均施術時間はツールの性能に依存すべきだが、ここでは簡易的にreductionを使用
-        effective_treatment_time = self.avg_treatment_time * (1.0 - tool_reduction)
-        effective_treatment_time = max(1.0, effective_treatment_time)
+        # 60秒ルール（キャパオーバー）: 処理数は単調増加なので、キャパ超過分は末尾にまとめて退店
+        processed_count = min(expected_customers, daily_capacity)
+        angry_leaves_count = expected_customers - processed_count
+        # 待ち時間切れで退店した客は -50 のレビュー
+        review_total = -50 * angry_leaves_count
+        daily_customers = processed_count
         
-        # 1日あたりの最大処理可能人数
-        daily_capacity = int((self.operating_time / effective_treatment_time) * staff_beds)
+        # 星レベル・グレードは1日の中で変わらないため、客ランクとアイテムは1日1回だけ取得
+        rank_data = state.get_current_customer_rank()
+        rank_name, tier, sublevel, plan_price, budget_min, budget_max, _ = rank_data
+        # WealthLevelを決定 (ティアからマッピング)
+        customer_wealth = _TIER_TO_WEALTH.get(tier, WealthLevel.POOREST)
+        # アイテムは (コスト, 価格, レビューボーナス) のタプルでカーネルへ渡す
+        reception_items = _item_rolls_for_star(state.star_level, "reception")
+        register_items = _item_rolls_for_star(state.star_level, "register")
         
-        processed_count = 0
-        angry_leaves_count = 0
+        # 今日の客層に対する各スタッフの (成功率, レビュー倍率) をランクの表から引いておく
+        wealth_success = _STAFF_SUCCESS_TABLE[customer_wealth]
+        staff_profiles = [
+            (wealth_success[member.rank], _STAFF_REVIEW_MULTIPLIER_TABLE[member.rank])
+            for member in state.staff
+        ]
+        if len(set(staff_profiles)) == 1:
+            staff_profiles = staff_profiles[:1]  # 全員同じ (昇格後は常にこの状態)
         
-        for _ in range(expected_customers):
-            # 60秒ルール（キャパオーバー）チェック
-            if processed_count >= daily_capacity:
-                # 待ち時間切れで退店
-                daily_reviews.append(-50)
-                angry_leaves_count += 1
-                continue
-                
-            processed_count += 1
-            
-            # 新システム: CUSTOMER_RANKSから現在の最高ランクを取得
-            rank_data = self.state.get_current_customer_rank()
-            rank_name, tier, sublevel, plan_price, budget_min, budget_max, _ = rank_data
-            additional_budget = random.randint(budget_min, budget_max)
-            customer_payment = plan_price + additional_budget
-            
-            # WealthLevelを決定 (ティアからマッピング)
-            tier_to_wealth = {
-                "Poorest": WealthLevel.POOREST,
-                "Poor": WealthLevel.POOR,
-                "Normal": WealthLevel.NORMAL,
-                "Rich": WealthLevel.RICH,
-                "Richest": WealthLevel.RICHEST,
-            }
-            customer_wealth = tier_to_wealth.get(tier, WealthLevel.POOREST)
-            
-            daily_customers += 1
-            
-            # スタッフ割り当て（ランダム）
-            staff = random.choice(self.state.staff)
-            success = random.random() < staff.get_success_rate(customer_wealth)
-            review_multiplier = staff.get_review_multiplier()
-            
-            if success:
-                daily_revenue += customer_payment
-                
-                # アイテム適用 (受付1つ + レジ1つ)
-                reception_items = self.state.get_available_items("reception")
-                register_items = self.state.get_available_items("register")
-                
-                # 受付アイテム
-                if reception_items:
-                    reception_item = random.choice(reception_items)
-                    expense_items += reception_item["cost"]
-                    daily_revenue += reception_item["price"]
-                    daily_reviews.append(int(reception_item["review_bonus"] * review_multiplier))
-                    
-                # レジアイテム
-                if register_items:
-                    register_item = random.choice(register_items)
-                    expense_items += register_item["cost"]
-                    daily_revenue += register_item["price"]
-                    daily_reviews.append(int(register_item["review_bonus"] * review_multiplier))
-                
-                # 基本レビュー
-                roll = random.random()
-                if roll < 0.80:
-                    base_review = 50
-                elif roll < 0.95:
-                    base_review = random.randint(30, 49)
-                else:
-                    base_review = random.randint(-10, 29)
-                daily_reviews.append(int(base_review * review_multiplier))
-            else:
-                # 失敗時
-                base_review = random.randint(-50, 0)
-                daily_reviews.append(int(base_review * review_multiplier))
+        served_revenue, expense_items, served_review = _serve_customers(
+            self.rng, processed_count, staff_profiles,
+            plan_price, budget_min, budget_max,
+            reception_items, register_items,
+        )
+        daily_revenue += served_revenue
+        review_total += served_review
         
         # 集客度更新 (良いレビューで上昇、上限はグレードのcap)
         # 顧客数ベースで平均を計算（エントリ数ではなく）
-        total_review = sum(daily_reviews)
-        avg_review_per_customer = total_review / daily_customers if daily_customers > 0 else 0
-        attraction_change = int((avg_review_per_customer / 5) * self.state.grade)  # グレード乗算: G6で平均40→+48ポイント
-        new_attraction = self.state.attraction_level + attraction_change
-        self.state.attraction_level = max(10, min(new_attraction, self.state.get_attraction_cap()))
+        avg_review_per_customer = review_total / daily_customers if daily_customers > 0 else 0
+        attraction_change = int((avg_review_per_customer / 5) * grade)  # グレード乗算: G6で平均40→+48ポイント
+        new_attraction = state.attraction_level + attraction_change
+        state.attraction_level = max(10, min(new_attraction, cap))
         
         # 今日のレビュー合計
-        today_review_total = sum(daily_reviews)
+        today_review_total = review_total
         
         # レビュー累積
-        self.state.cumulative_review += today_review_total
-        self.state.cumulative_review = max(0, self.state.cumulative_review)
-        self.state.update_star_rating()
+        state.cumulative_review += today_review_total
+        state.cumulative_review = max(0, state.cumulative_review)
+        state.update_star_rating()
         
         # 収支更新
         net = daily_revenue - daily_expenses
-        self.state.money += net
-        self.state.total_revenue += daily_revenue
-        self.state.total_expenses += daily_expenses
-        self.state.customers_served += daily_customers
-        self.state.day += 1
+        state.money += net
+        state.total_revenue += daily_revenue
+        state.total_expenses += daily_expenses
+        state.customers_served += daily_customers
+        state.day += 1
+        
+        # 結果を使わない実行 (統計スイープ等) では日次結果を作らない
+        if not self.collect_results:
+            return None
         
-        return {
-            "day": self.state.day - 1,
-            "grade": self.state.grade,
-            "stars": self.state.star_rating,
-            "revenue": daily_revenue,
-            "expenses": daily_expenses,
-            "net": net,
-            "money": self.state.money,
+        return DayResult(
+            day=state.day - 1,
+            grade=grade,
+            stars=state.star_rating,
+            revenue=daily_revenue,
+            expenses=daily_expenses,
+            net=net,
+            money=state.money,
             # 詳細経費
-            "expense_ad": expense_ad,
-            "expense_rent": expense_rent,
-            "expense_staff": expense_staff,
-            "expense_loan": expense_loan,
-            "expense_items": expense_items,
+            expense_ad=expense_ad,
+            expense_rent=expense_rent,
+            expense_staff=expense_staff,
+            expense_loan=expense_loan,
+            expense_items=expense_items,
             # スタッフ情報
-            "staff_count": len(self.state.staff),
+            staff_count=len(state.staff),
             # ローン情報
-            "active_loans": len([l for l in self.state.loans if l.remaining_days > 0]),
-            "new_loan": new_loan_taken,
+            active_loans=len(state.loans),
+            new_loan=new_loan_taken,
             # 広告情報
-            "new_ad": new_ad_started,
-            "active_ads_count": len(self.state.active_ads),
-            "ad_boost": total_ad_boost,
+            new_ad=new_ad_started,
+            active_ads_count=len(ad_types),
+            ad_boost=total_ad_boost,
             # 顧客情報
-            "customers": daily_customers,
-            "max_customers": max_customers,
-            "attraction_level": self.state.attraction_level,
-            "attraction_cap": self.state.get_attraction_cap(),
+            customers=daily_customers,
+            max_customers=max_customers,
+            attraction_level=state.attraction_level,
+            attraction_cap=cap,
             # レビュー情報
-            "today_review": today_review_total,
-            "review_total": self.state.cumulative_review,
-        }
+            today_review=today_review_total,
+            review_total=state.cumulative_review,
+        )
     
     def try_upgrade(self) -> tuple:
         """グレードアップを試みる。Returns (upgraded, loan_info)"""
@@ -846,31 +1111,24 @@ class SalonSimulator:
             return False, None
         
         next_grade = self.state.grade + 1
-        config = GRADE_CONFIG[next_grade]
+        # 総コスト (アップグレード費用 + ツール一式) はグレードごとに計算済み
+        total_cost = _GRADE_TOTAL_COST[next_grade]
         
-        if self.state.star_rating < config["required_stars"]:
+        # ローンなしで資金不足なら、それ以上の判定は不要 (毎日呼ばれるため最初に判定)
+        if self.state.money < total_cost and not self.use_loans:
             return False, None
-            
-        # ツールコスト計算 (自動購入)
-        tool_cost = 0
-        if next_grade in TOOL_CONFIG:
-            for tool in TOOL_CONFIG[next_grade].values():
-                tool_cost += tool["cost"]
-        # 全ベッド分
-        tool_cost *= config["beds"]
         
-        # 総コスト (アップグレード費用 + ツール一式)
-        total_cost = config["upgrade_cost"] + tool_cost
+        config = GRADE_CONFIG[next_grade]
+        if self.state.star_rating < config["required_stars"]:
+            return False, None
         
         loan_info = None
         
-        # コストチェック
+        # コストチェック (ローンなしの資金不足は冒頭で除外済み)
         if self.state.money < total_cost:
-            if not self.use_loans:
-                return False, None
-            
             # 現在の未返済ローン種類を取得（同種類は完済まで借りられない）
-            active_loan_types = [loan.loan_type for loan in self.state.loans if not loan.is_paid_off()]
+            # 完済ローンは日次返済で除去済みなので残っているものは全て未返済。判定はsetで行う
+            active_loan_types = {loan.loan_type for loan in self.state.loans}
             
             # 最大3種類までのローン制限
             if len(active_loan_types) >= MAX_ACTIVE_LOANS:
@@ -881,8 +1139,8 @@ class SalonSimulator:
             loans_taken = []
             total_borrowed = 0
             
-            # 利用可能なローンを金額順（大きい順）でソートして借りる
-            for loan_name, loan_cfg in sorted(LOAN_CONFIG.items(), key=lambda x: -x[1]["max_amount"]):
+            # 利用可能なローンを金額順（大きい順、import時にソート済み）で借りる
+            for loan_name, loan_cfg in _LOANS_BY_AMOUNT:
                 # 同種類のローンが既にあるか確認
                 if loan_name in active_loan_types:
                     continue
@@ -916,27 +1174,15 @@ class SalonSimulator:
         
         
         # アップグレード実行
-        self.state.grade = next_grade
+        self.state.upgrade_grade(next_grade)
         self.state.money -= config["upgrade_cost"]
         
         # ツール更新と支払い
-        self.state.money -= tool_cost
+        self.state.money -= _GRADE_TOOL_COST[next_grade]
         self.state.tool_grade = next_grade
         
         # スタッフランク設定（グレードに応じたランクで雇用/昇格）
-        
-        # スタッフランク設定（グレードに応じたランクで雇用/昇格）
-        # G1-2: 大学生, G3: 新卒, G4: 中堅, G5: ベテラン, G6-7: プロ
-        staff_rank_by_grade = {
-            1: StaffRank.STUDENT,
-            2: StaffRank.STUDENT,
-            3: StaffRank.NEWBIE,
-            4: StaffRank.REGULAR,
-            5: StaffRank.VETERAN,
-            6: StaffRank.PRO,
-            7: StaffRank.PRO,
-        }
-        hire_rank = staff_rank_by_grade.get(next_grade, StaffRank.NEWBIE)
+        hire_rank = _HIRE_RANK_BY_GRADE[next_grade - 1]
         
         # 既存スタッフを新ランクに昇格
         for staff in self.state.staff:
@@ -948,67 +1194,122 @@ class SalonSimulator:
         
         return True, loan_info
     
-    def run(self, max_days: int = 100) -> List[dict]:
-        """シミュレーション実行"""
+    def run(self, max_days: int = 100) -> List[DayResult]:
+        """シミュレーション実行 (collect_results=False なら空リストを返す)"""
         results = []
+        # 日次変動 (+-3) は実行開始時にまとめて抽選
+        daily_variances = self.rng.choices(_DAILY_VARIANCES, k=max_days)
+        
+        if not self.collect_results:
+            # 結果収集なし: 日次処理とアップグレードだけを回す
+            for daily_variance in daily_variances:
+                self.simulate_day(daily_variance)
+                self.try_upgrade()
+                if self.state.grade >= MAX_GRADE:
+                    break
+            return results
+        
+        # verbose表示は1行ずつprintせず、行をためて実行終了時にまとめて書き出す
+        verbose = self.verbose
+        log_lines = []
+        log = log_lines.append
         
-        for _ in range(max_days):
-            result = self.simulate_day()
+        for daily_variance in daily_variances:
+            result = self.simulate_day(daily_variance)
             results.append(result)
             
-            if self.verbose:
+            if verbose:
                 r = result
                 # 基本情報
-                print(f"Day {r['day']}: G{r['grade']} *{r['stars']} | "
-                      f"Money: ${r['money']} | "
-                      f"Customers: {r['customers']}/{r['max_customers']} (Attr:{r['attraction_level']}/{r['attraction_cap']})")
+                log(f"Day {r.day}: G{r.grade} *{r.stars} | "
+                    f"Money: ${r.money} | "
+                    f"Customers: {r.customers}/{r.max_customers} (Attr:{r.attraction_level}/{r.attraction_cap})")
                 # 詳細 (経費がある場合のみ)
                 expenses = []
-                if r['expense_rent'] > 0:
-                    expenses.append(f"Rent:${r['expense_rent']}")
-                if r['expense_staff'] > 0:
-                    expenses.append(f"Staff({r['staff_count']}):${r['expense_staff']}")
-                if r['expense_loan'] > 0:
-                    expenses.append(f"Loan:${r['expense_loan']}")
-                if r['expense_ad'] > 0:
-                    expenses.append(f"Ad:${r['expense_ad']}")
+                if r.expense_rent > 0:
+                    expenses.append(f"Rent:${r.expense_rent}")
+                if r.expense_staff > 0:
+                    expenses.append(f"Staff({r.staff_count}):${r.expense_staff}")
+                if r.expense_loan > 0:
+                    expenses.append(f"Loan:${r.expense_loan}")
+                if r.expense_ad > 0:
+                    expenses.append(f"Ad:${r.expense_ad}")
                 if expenses:
-                    print(f"       Expenses: {' | '.join(expenses)}")
-                print(f"       Revenue:${r['revenue']} Net:${r['net']} Review:+{r['today_review']} (Total:{r['review_total']})")
+                    log(f"       Expenses: {' | '.join(expenses)}")
+                log(f"       Revenue:${r.revenue} Net:${r.net} Review:+{r.today_review} (Total:{r.review_total})")
             
             # アップグレード試行
             upgraded, loan_info = self.try_upgrade()
             if upgraded:
-                result['upgraded'] = True
+                result.upgraded = True
                 if loan_info:
-                    result['loan_info'] = loan_info
+                    result.loan_info = loan_info
                     # 借入額を記録
                     if "total" in loan_info:
-                        result['borrowed_amount'] = loan_info['total']
+                        result.borrowed_amount = loan_info['total']
                     else:
-                        result['borrowed_amount'] = loan_info['principal']
+                        result.borrowed_amount = loan_info['principal']
                 
-                if self.verbose:
+                if verbose:
                     msg = f"  >>> Upgraded to Grade {self.state.grade}!"
                     if loan_info:
                         if "loans" in loan_info:
                             msg += f" [LOANS: ${loan_info['total']} ({len(loan_info['loans'])} loans)]"
                         else:
                             msg += f" [LOAN: {loan_info['type']} ${loan_info['principal']} @{loan_info['rate']*100:.1f}%/day for {loan_info['term']}d]"
-                    print(msg)
+                    log(msg)
             
             # 目標達成チェック
             if self.state.grade >= MAX_GRADE:
-                if self.verbose:
-                    print(f"\n*** Reached Grade {MAX_GRADE} on Day {result['day']}! ***")
+                if verbose:
+                    log(f"\n*** Reached Grade {MAX_GRADE} on Day {result.day}! ***")
                 break
         
+        if log_lines:
+            sys.stdout.write("\n".join(log_lines) + "\n")
         return results
 
 # ============================================
 # 実行
 # ============================================
 
+# ワーカープロセスごとに1つだけ作り、実行ごとに reset して使い回すシミュレーター
+_sweep_simulator = None
+
+
+def _init_sweep_worker(config: dict):
+    global _sweep_simulator
+    _sweep_simulator = SalonSimulator(config=config)
+
+
+def _days_to_max_grade(seed: int) -> int:
+    """1回分のシミュレーションを実行し、最大グレード到達日数を返す (未達成は100)"""
+    sim = _sweep_simulator
+    # ワーカー間で乱数列が重ならないよう、実行ごとに個別のシードを使う
+    sim.reset(seed)
+    sim.run(max_days=100)
+    
+    if sim.state.grade >= MAX_GRADE:
+        return sim.state.day - 1  # 最後にシミュレートした日
+    return 100  # 未達成
+
+
+def sweep_days_to_max_grade(num_runs: int, operating_time: int, use_loans: bool, seed: int = None) -> List[int]:
+    """独立したnum_runs回のシミュレーションをプロセスプールで並列実行 (seed指定で再現可能)"""
+    config = {
+        "operating_time": operating_time,
+        "avg_treatment_time": 15,
+        "use_loans": use_loans,
+        "verbose": False,
+        "collect_results": False,
+    }
+    # 各回のシードは親の乱数生成器から派生させる (seedが同じなら同じ集合の結果になる)
+    seeder = random.Random(seed)
+    seeds = [seeder.getrandbits(64) for _ in range(num_runs)]
+    with multiprocessing.Pool(initializer=_init_sweep_worker, initargs=(config,)) as pool:
+        return list(pool.imap_unordered(_days_to_max_grade, seeds, chunksize=4))
+
+
 def main():
     # 設定: 1日の長さをここで変更 (600秒=基準, 450秒=75%)
     OPERATING_TIME = 450  # 450秒 = 7.5分 (目標設定)
@@ -1017,23 +1318,9 @@ def main():
     print(f"Hair Removal Salon Simulator (Operating Time: {OPERATING_TIME}s)")
     print("=" * 60)
     
-    # 複数回シミュレーション (ローンなし)
+    # 複数回シミュレーション (ローンなし) — 各回は独立なのでプロセスプールで並列実行
     num_runs = 100
-    days_to_grade7 = []
-    
-    for i in range(num_runs):
-        sim = SalonSimulator(config={
-            "operating_time": OPERATING_TIME,
-            "avg_treatment_time": 15,
-            "use_loans": False,
-            "verbose": False,
-        })
-        results = sim.run(max_days=100)
-        
-        if sim.state.grade >= 7:
-            days_to_grade7.append(results[-1]["day"])
-        else:
-            days_to_grade7.append(100)  # 未達成
+    days_to_grade7 = sweep_days_to_max_grade(num_runs, OPERATING_TIME, use_loans=False)
     
     print(f"\n[Result] Simulation NO LOANS ({num_runs} runs)")
     print("-" * 40)
@@ -1043,21 +1330,7 @@ def main():
     print(f"  Max: {max(days_to_grade7)} days")
     
     # 複数回シミュレーション (ローンあり)
-    days_to_grade7_loans = []
-    
-    for i in range(num_runs):
-        sim = SalonSimulator(config={
-            "operating_time": OPERATING_TIME,
-            "avg_treatment_time": 15,
-            "use_loans": True,
-            "verbose": False,
-        })
-        results = sim.run(max_days=100)
-        
-        if sim.state.grade >= 7:
-            days_to_grade7_loans.append(results[-1]["day"])
-        else:
-            days_to_grade7_loans.append(100)  # 未達成
+    days_to_grade7_loans = sweep_days_to_max_grade(num_runs, OPERATING_TIME, use_loans=True)
     
     print(f"\n[Result] Simulation WITH LOANS ({num_runs} runs)")
     print("-" * 40)
@@ -1085,7 +1358,7 @@ def main():
     print(f"  Net Profit: ${sim_no_loan.state.total_revenue - sim_no_loan.state.total_expenses}")
     print(f"  Final Money: ${sim_no_loan.state.money}")
     print(f"  Final Grade: {sim_no_loan.state.grade}")
-    print(f"  Days: {results_no_loan[-1]['day']}")
+    print(f"  Days: {results_no_loan[-1].day}")
     
     # 詳細シミュレーション (ローンあり)
     print("\n" + "=" * 60)
@@ -1106,21 +1379,24 @@ def main():
     print(f"  Net Profit: ${sim_loan.state.total_revenue - sim_loan.state.total_expenses}")
     print(f"  Final Money: ${sim_loan.state.money}")
     print(f"  Final Grade: {sim_loan.state.grade}")
-    print(f"  Days: {results_loan[-1]['day']}")
-    print(f"  Active Loans: {len([l for l in sim_loan.state.loans if l.remaining_days > 0])}")
+    print(f"  Days: {results_loan[-1].day}")
+    print(f"  Active Loans: {len(sim_loan.state.loans)}")
     
     # 比較
     print("\n" + "=" * 60)
     print("COMPARISON: No Loans vs With Loans")
     print("=" * 60)
-    days_no = results_no_loan[-1]['day'] if sim_no_loan.state.grade >= MAX_GRADE else 50
-    days_yes = results_loan[-1]['day'] if sim_loan.state.grade >= MAX_GRADE else 50
+    days_no = results_no_loan[-1].day if sim_no_loan.state.grade >= MAX_GRADE else 50
+    days_yes = results_loan[-1].day if sim_loan.state.grade >= MAX_GRADE else 50
     print(f"  Days to Grade {MAX_GRADE}: {days_no} (no loans) vs {days_yes} (with loans)")
     print(f"  Time saved: {days_no - days_yes} days")
     
     # CSV出力
-    import csv
-    import os
+    # 各グレードから見た次のグレードのアップグレード費用 (最大グレードは自身の値)
+    next_upgrade_cost = {
+        grade: GRADE_CONFIG[grade + 1 if grade < MAX_GRADE else grade]["upgrade_cost"]
+        for grade in GRADE_CONFIG
+    }
     csv_path = os.path.join(os.path.dirname(__file__), "simulation_results.csv")
     with open(csv_path, 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
@@ -1131,38 +1407,37 @@ def main():
             "UpgradeCost", "Upgraded", "Borrowed"
         ])
         
-        # ローンありの結果
-        for r in results_loan:
-            next_grade = r['grade'] + 1 if r['grade'] < MAX_GRADE else r['grade']
-            upgrade_cost = GRADE_CONFIG[next_grade]["upgrade_cost"] if next_grade <= MAX_GRADE else 0
-            borrowed = r.get('borrowed_amount', 0)
-            writer.writerow([
-                "WithLoan", r['day'], r['grade'], r['stars'], r['money'],
-                r['customers'], r['max_customers'], 
-                r['attraction_level'], int(r['ad_boost']), r['attraction_cap'],
-                r['revenue'], r['expense_rent'], r['staff_count'], r['expense_staff'], 
-                r['expense_loan'], r['expense_ad'], r['expense_items'],
-                r['expenses'], r['revenue'] - r['expenses'],
-                r['today_review'], r['review_total'],
-                upgrade_cost, "Yes" if r.get('upgraded') else "",
-                borrowed if borrowed > 0 else ""
-            ])
+        # ローンありの結果 (1行ずつではなくwriterowsでまとめて書き出す)
+        writer.writerows(
+            [
+                "WithLoan", r.day, r.grade, r.stars, r.money,
+                r.customers, r.max_customers, 
+                r.attraction_level, int(r.ad_boost), r.attraction_cap,
+                r.revenue, r.expense_rent, r.staff_count, r.expense_staff, 
+                r.expense_loan, r.expense_ad, r.expense_items,
+                r.expenses, r.revenue - r.expenses,
+                r.today_review, r.review_total,
+                next_upgrade_cost[r.grade], "Yes" if r.upgraded else "",
+                r.borrowed_amount or ""
+            ]
+            for r in results_loan
+        )
         
         # ローンなしの結果
-        for r in results_no_loan:
-            next_grade = r['grade'] + 1 if r['grade'] < MAX_GRADE else r['grade']
-            upgrade_cost = GRADE_CONFIG[next_grade]["upgrade_cost"] if next_grade <= MAX_GRADE else 0
-            writer.writerow([
-                "NoLoan", r['day'], r['grade'], r['stars'], r['money'],
-                r['customers'], r['max_customers'], 
-                r['attraction_level'], int(r['ad_boost']), r['attraction_cap'],
-                r['revenue'], r['expense_rent'], r['staff_count'], r['expense_staff'], 
-                r['expense_loan'], r['expense_ad'], r['expense_items'],
-                r['expenses'], r['revenue'] - r['expenses'],
-                r['today_review'], r['review_total'],
-                upgrade_cost, "Yes" if r.get('upgraded') else "",
+        writer.writerows(
+            [
+                "NoLoan", r.day, r.grade, r.stars, r.money,
+                r.customers, r.max_customers, 
+                r.attraction_level, int(r.ad_boost), r.attraction_cap,
+                r.revenue, r.expense_rent, r.staff_count, r.expense_staff, 
+                r.expense_loan, r.expense_ad, r.expense_items,
+                r.expenses, r.revenue - r.expenses,
+                r.today_review, r.review_total,
+                next_upgrade_cost[r.grade], "Yes" if r.upgraded else "",
                 ""
-            ])
+            ]
+            for r in results_no_loan
+        )
     
     print(f"\n[CSV] Detailed results exported to: {csv_path}")
     
@@ -1174,11 +1449,11 @@ def main():
     print("-" * 80)
     for r in results_loan:
         event = ""
-        if r.get('upgraded'):
-            event = f"Upgrade to G{r['grade']}"
-        if r.get('loan_info'):
+        if r.upgraded:
+            event = f"Upgrade to G{r.grade}"
+        if r.loan_info:
             event += " +Loan"
-        print(f"{r['day']:>4} | G{r['grade']:>1} | {r['stars']:>2} | ${r['money']:>9} | {r['customers']:>5} | ${r['revenue']:>7} | ${r['expenses']:>7} | ${r['revenue']-r['expenses']:>7} | +{r['today_review']:>6} | {event}")
+        print(f"{r.day:>4} | G{r.grade:>1} | {r.stars:>2} | ${r.money:>9} | {r.customers:>5} | ${r.revenue:>7} | ${r.expenses:>7} | ${r.revenue-r.expenses:>7} | +{r.today_review:>6} | {event}")
 
 if __name__ == "__main__":
     main()
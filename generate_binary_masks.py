@@ -6,11 +6,16 @@ Usage:
     python generate_binary_masks.py
 """
 
-from PIL import Image, ImageDraw
+from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import io
 import os
 
 TEXTURE_SIZE = 2048
 OUTPUT_DIR = "Assets/Textures/PartMasks"
+# Flat masks compress well at any level; zlib level 1 encodes much faster than the default 6
+PNG_COMPRESS_LEVEL = 1
 
 # UV Regions from BodyPartMaskGenerator log
 # Format: (x, y, width, height)
@@ -40,9 +45,8 @@ PART_REGIONS = {
 
 def generate_binary_mask(part_name, regions, size=TEXTURE_SIZE):
     """Generate a single binary mask texture"""
-    # Create black image
-    img = Image.new('RGB', (size, size), (0, 0, 0))
-    draw = ImageDraw.Draw(img)
+    # Create black single-channel image (a binary mask needs no RGB)
+    img = Image.new('L', (size, size), 0)
     
     for (x, y, w, h) in regions:
         # Calculate end coordinates
@@ -61,19 +65,27 @@ def generate_binary_mask(part_name, regions, size=TEXTURE_SIZE):
         px1, px2 = min(px1, px2), max(px1, px2)
         py1, py2 = min(py1, py2), max(py1, py2)
         
-        # Paint white
-        draw.rectangle([px1, py1, px2, py2], fill=(255, 255, 255))
+        # Paint white (rectangle is inclusive of px2/py2, paste box is exclusive)
+        img.paste(255, (px1, py1, px2 + 1, py2 + 1))
         
         print(f"  Region: [{px1},{py1},{px2},{py2}]")
     
-    # Save
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    # Save (main creates OUTPUT_DIR once before starting the workers)
     filename = f"Mask_{part_name}.png"
     filepath = os.path.join(OUTPUT_DIR, filename)
-    img.save(filepath, 'PNG')
+    img.save(filepath, 'PNG', compress_level=PNG_COMPRESS_LEVEL)
     print(f"  -> Saved: {filepath}")
     return img
 
+def _generate_part(part):
+    """Worker: generate one part's mask and return its log text"""
+    part_name, regions = part
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        print(f"[{part_name}]")
+        generate_binary_mask(part_name, regions)
+    return log.getvalue()
+
 def main():
     print("=" * 60)
     print("Binary Mask Texture Generator")
@@ -82,10 +94,12 @@ def main():
     print(f"Output directory: {OUTPUT_DIR}")
     print()
     
-    for part_name, regions in PART_REGIONS.items():
-        print(f"[{part_name}]")
-        generate_binary_mask(part_name, regions)
-        print()
+    # Parts are independent and PNG encoding is CPU-bound: render them in parallel,
+    # then print each part's log in the original order
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    with ProcessPoolExecutor() as executor:
+        for log in executor.map(_generate_part, PART_REGIONS.items()):
+            print(log)
     
     print("=" * 60)
     print("Done! Import in Unity with these settings:")
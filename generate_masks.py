@@ -4,21 +4,36 @@ Run this script from the project root directory.
 It generates mask textures based on BodyPartDefinition settings.
 
 Usage:
-    python generate_masks.py
+    python generate_masks.py [--verbose] [--size N]
+
+    --verbose  print every part rect instead of one summary line per mask
+    --size N   texture size in pixels (default 2048)
 
 Requirements:
     pip install Pillow
 """
 
 from PIL import Image, ImageDraw, ImageFont
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import argparse
 import os
+import struct
+import zlib
 
 # Configuration
+# The masks are a few flat rects sampled with Point filtering, so 512 or even 256 is
+# enough to resolve the smallest part (an armpit is ~42x61 px at 512). Rect edges
+# are snapped to the pixel grid, so lower sizes move boundaries by up to 1/size in UV;
+# 2048 stays the default so the existing textures keep their exact edges.
 TEXTURE_SIZE = 2048
 OUTPUT_DIR = "Assets/Textures/BodyPartMasks"
+# Flat masks compress well at any level; zlib level 1 encodes much faster than the default 6
+PNG_COMPRESS_LEVEL = 1
 
 # Body Part Definitions (maskValue -> RGB)
 # maskValue * 255 = R value (G=0, B=0)
+# Mask textures are saved single-channel ('L'): the gray value is the R value
 
 def mask_to_rgb(mask_value):
     """Convert maskValue (0.0-1.0) to RGB tuple"""
@@ -71,6 +86,14 @@ LEG_PARTS = [
     (0.0, 0.24, 0.5, 0.3, 0.70, "RightCalf"),
 ]
 
+# (label, parts, filename) for each material's mask texture
+MASK_SETS = [
+    ("Head", HEAD_PARTS, "Head_BodyPartMask.png"),
+    ("Body", BODY_PARTS, "Body_BodyPartMask.png"),
+    ("Arm", ARM_PARTS, "Arm_BodyPartMask.png"),
+    ("Leg", LEG_PARTS, "Leg_BodyPartMask.png"),
+]
+
 def uv_to_pixel(uv_x, uv_y, size):
     """Convert UV coordinates to pixel coordinates"""
     # UV: Y=0 is bottom, Y=1 is top
@@ -80,12 +103,10 @@ def uv_to_pixel(uv_x, uv_y, size):
     py = int((1.0 - uv_y) * size)  # Flip Y
     return px, py
 
-def generate_mask(parts, filename, size=TEXTURE_SIZE):
-    """Generate a mask texture for a set of body parts"""
-    # Create black image
-    img = Image.new('RGB', (size, size), (0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
+@functools.lru_cache(maxsize=None)
+def pixel_rects(parts, size=TEXTURE_SIZE):
+    """Convert a tuple of UV parts to (px1, py1, px2, py2, r_value, mask_value, name) pixel rects (cached per size)"""
+    rects = []
     # Format: (x, y, width, height, mask_value, name)
     for x, y, w, h, mask_value, name in parts:
         # Calculate end coordinates
@@ -104,40 +125,80 @@ def generate_mask(parts, filename, size=TEXTURE_SIZE):
         px1, px2 = min(px1, px2), max(px1, px2)
         py1, py2 = min(py1, py2), max(py1, py2)
         
-        color = mask_to_rgb(mask_value)
-        draw.rectangle([px1, py1, px2, py2], fill=color)
-        
-        print(f"  {name}: maskValue={mask_value}, R={color[0]}, rect=[{px1},{py1},{px2},{py2}]")
+        # Only the R byte (mask_to_rgb's first channel) is written to the mask
+        rects.append((px1, py1, px2, py2, int(mask_value * 255), mask_value, name))
+    return tuple(rects)
+
+def render_mask(parts, size=TEXTURE_SIZE, verbose=False):
+    """Fill a mask for a set of body parts as PNG scanlines (per row: filter byte 0 + size gray bytes)"""
+    # Black single-channel buffer laid out exactly as the PNG IDAT stream expects,
+    # so the writer can compress it as-is; the zeroed filter bytes mean "None"
+    stride = size + 1
+    scanlines = bytearray(size * stride)
     
-    # Save
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    # Pixel rects are computed once per part list and size
+    for px1, py1, px2, py2, r_value, mask_value, name in pixel_rects(tuple(parts), size):
+        # Rect is inclusive of px2/py2; clip to the texture like the old rasterizer did
+        x_end = min(px2 + 1, size)
+        y_end = min(py2 + 1, size)
+        row_fill = bytes([r_value]) * (x_end - px1)
+        for row_start in range(py1 * stride + 1, y_end * stride, stride):
+            scanlines[row_start + px1:row_start + x_end] = row_fill
+        
+        if verbose:
+            print(f"  {name}: maskValue={mask_value}, R={r_value}, rect=[{px1},{py1},{px2},{py2}]")
+    return scanlines
+
+def _png_chunk(chunk_type, data):
+    """Length + type + data + CRC, as laid out in the PNG spec"""
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+def write_gray_png(filepath, scanlines, size):
+    """Write 8-bit gray PNG scanlines (filter type 0, as from render_mask) directly with zlib"""
+    header = struct.pack(">IIBBBBB", size, size, 8, 0, 0, 0, 0)  # 8-bit grayscale, no interlace
+    with open(filepath, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_png_chunk(b"IHDR", header))
+        f.write(_png_chunk(b"IDAT", zlib.compress(scanlines, PNG_COMPRESS_LEVEL)))
+        f.write(_png_chunk(b"IEND", b""))
+
+def save_mask(scanlines, filename, size=TEXTURE_SIZE):
+    """Encode mask scanlines as PNG into OUTPUT_DIR (must already exist) and return its path"""
     filepath = os.path.join(OUTPUT_DIR, filename)
-    img.save(filepath, 'PNG')
-    print(f"  -> Saved: {filepath}")
-    return img
+    write_gray_png(filepath, scanlines, size)
+    return filepath
+
+def texture_size(value):
+    """argparse type for --size: a positive pixel count"""
+    size = int(value)
+    if size < 1:
+        raise argparse.ArgumentTypeError(f"texture size must be at least 1, got {size}")
+    return size
 
-def main():
+def main(verbose=False, size=TEXTURE_SIZE):
     print("=" * 60)
     print("Body Part Mask Texture Generator")
     print("=" * 60)
-    print(f"Texture size: {TEXTURE_SIZE}x{TEXTURE_SIZE}")
+    print(f"Texture size: {size}x{size}")
     print(f"Output directory: {OUTPUT_DIR}")
     print()
     
-    print("[Head]")
-    generate_mask(HEAD_PARTS, "Head_BodyPartMask.png")
-    print()
-    
-    print("[Body]")
-    generate_mask(BODY_PARTS, "Body_BodyPartMask.png")
-    print()
-    
-    print("[Arm]")
-    generate_mask(ARM_PARTS, "Arm_BodyPartMask.png")
-    print()
+    # Create the output directory once, before any worker writes into it
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     
-    print("[Leg]")
-    generate_mask(LEG_PARTS, "Leg_BodyPartMask.png")
+    # Fills are cheap; PNG encoding dominates and zlib releases the GIL while
+    # compressing, so each mask is handed to a thread as soon as it is filled
+    with ThreadPoolExecutor(max_workers=len(MASK_SETS)) as executor:
+        saves = []
+        for label, parts, filename in MASK_SETS:
+            print(f"[{label}] {filename}: {len(parts)} rects")
+            scanlines = render_mask(parts, size, verbose)
+            saves.append(executor.submit(save_mask, scanlines, filename, size))
+            if verbose:
+                print()
+        print()
+        for save in saves:
+            print(f"  -> Saved: {save.result()}")
     print()
     
     print("=" * 60)
@@ -178,8 +239,12 @@ def main():
         y += 50
     
     ref_path = os.path.join(OUTPUT_DIR, "ColorReference.png")
-    ref_img.save(ref_path, 'PNG')
+    ref_img.save(ref_path, 'PNG', compress_level=PNG_COMPRESS_LEVEL)
     print(f"  -> Saved: {ref_path}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Generate body part mask textures")
+    parser.add_argument("--verbose", action="store_true", help="print every part rect")
+    parser.add_argument("--size", type=texture_size, default=TEXTURE_SIZE, help="texture size in pixels")
+    args = parser.parse_args()
+    main(verbose=args.verbose, size=args.size)